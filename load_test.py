@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Фейковые ключи и отдельная БД Redis должны быть заданы до импорта src.config.
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:LOADTEST")
+os.environ.setdefault("BYBIT_API_KEY", "loadtest")
+os.environ.setdefault("BYBIT_API_SECRET", "loadtest")
+os.environ.setdefault("KUCOIN_API_KEY", "loadtest")
+os.environ.setdefault("KUCOIN_API_SECRET", "loadtest")
+os.environ.setdefault("KUCOIN_API_PASSPHRASE", "loadtest")
+os.environ.setdefault("LOG_FILE_PATH", "logs/load_test.log")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест бота против локальных фейковых Telegram и бирж.")
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="Число пользователей для каждого прогона")
+    parser.add_argument("--symbols", type=int, default=500, help="Число монет на каждой бирже")
+    parser.add_argument("--interval", type=int, default=1, help="Интервал проверки, передаваемый через /conf")
+    parser.add_argument("--threshold", type=float, default=5, help="Порог изменения, передаваемый через /conf")
+    parser.add_argument("--duration", type=float, default=60, help="Длительность фазы ценовых шоков, сек")
+    parser.add_argument("--shock-every", type=float, default=5, help="Период между ценовыми шоками, сек")
+    parser.add_argument("--port", type=int, default=8089, help="Порт фейковых серверов")
+    parser.add_argument("--redis-db", type=int, default=15, help="Номер БД Redis (будет очищена!)")
+    parser.add_argument("--log-level", default="WARNING", help="Уровень логирования бота во время теста")
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def run_scenario(args):
+    """Один прогон в текущем процессе: роутер aiogram нельзя подключить к диспетчеру повторно."""
+    from src.loadtest.harness import LoadTestScenario
+
+    scenario = LoadTestScenario(
+        users=args.scenario,
+        symbols=args.symbols,
+        interval=args.interval,
+        threshold=args.threshold,
+        duration=args.duration,
+        shock_every=args.shock_every,
+        port=args.port,
+    )
+    result = asyncio.run(scenario.run())
+    with open(args.output, "w") as output:
+        json.dump(result, output)
+
+
+def main():
+    args = parse_args()
+    os.environ["REDIS_DB"] = str(args.redis_db)
+    os.environ["LOG_LEVEL"] = args.log_level
+
+    if args.scenario is not None:
+        run_scenario(args)
+        return
+
+    results = []
+    for users in args.users:
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            command = [sys.executable, __file__, "--scenario", str(users), "--output", output.name]
+            for option in ("symbols", "interval", "threshold", "duration", "shock_every", "port", "redis_db", "log_level"):
+                command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+
+            subprocess.run(command, check=True)
+            output.seek(0)
+            results.append(json.load(output))
+
+    print(f"{'users':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'msg/s':>9} {'rss MB':>9} {'lag p99 ms':>11} {'lag max ms':>11}")
+    for result in results:
+        latency = result["alert_latency_sec"]
+        lag = result["loop_lag_sec"]
+        print(f"{result['users']:>8} {latency['50'] * 1000:>9.1f} {latency['90'] * 1000:>9.1f} "
+              f"{latency['99'] * 1000:>9.1f} {result['messages_per_sec']:>9.1f} {result['rss_mb']['peak']:>9.1f} "
+              f"{lag['p99'] * 1000:>11.1f} {lag['max'] * 1000:>11.1f}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
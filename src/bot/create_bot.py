@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from aiogram import Bot, Dispatcher
 from aiogram.types import BotCommand
 from .handlers import router, set_crypto_monitor
@@ -7,6 +9,7 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from src.crypto.crypto_checker import CryptoBotController
+from src.crypto.exchange import Exchange
 
 from src.crypto.exchanges.bybit import Bybit
 from src.crypto.exchanges.kucoin import KuCoin
@@ -25,14 +28,23 @@ async def set_bot_commands(bot: Bot):
         BotCommand(command="conf", description="Настройки мониторинга"),
         BotCommand(command="start_monitor", description="Запуск мониторинга"),
         BotCommand(command="stop_monitor", description="Остановка мониторинга"),
+        BotCommand(command="rule", description="Правило алертов"),
+        BotCommand(command="top", description="Лидеры роста и падения"),
     ]
     await bot.set_my_commands(commands)
 
-async def start_bot():
+async def start_bot(bot: Bot = bot, exchanges: Optional[List[Exchange]] = None):
+    """
+    Запуск бота и мониторинга.
+
+    :param bot: Экземпляр Telegram бота (по умолчанию — бот из TELEGRAM_BOT_TOKEN).
+    :param exchanges: Список бирж для мониторинга (по умолчанию — Bybit и KuCoin).
+    """
     dp = Dispatcher(storage=MemoryStorage())
     logger.info("Starting the bot...")
 
-    exchanges = [Bybit(), KuCoin()]
+    if exchanges is None:
+        exchanges = [Bybit(), KuCoin()]
     crypto_monitor = CryptoBotController(exchanges, bot)
 
     set_crypto_monitor(crypto_monitor)
@@ -41,4 +53,9 @@ async def start_bot():
     await set_bot_commands(bot)
     await bot.delete_webhook(drop_pending_updates=True)
     await crypto_monitor.restart_active_sessions()
-    await dp.start_polling(bot)
\ No newline at end of file
+    crypto_monitor.start_background_tasks()
+
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await crypto_monitor.shutdown()
\ No newline at end of file
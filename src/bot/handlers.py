@@ -1,7 +1,12 @@
+import html
+
 from aiogram import Router, F
-from aiogram.filters import CommandStart, Command
+from aiogram.filters import CommandStart, Command, CommandObject
 from aiogram.types import Message
 
+from src.crypto.alert_rules import FIELDS, OPERATORS
+from src.config import ADMIN_IDS, PROFILE_MAX_DURATION
+
 from src.utils.logging_config import logger
 
 router = Router()
@@ -18,7 +23,7 @@ async def cmd_start(message: Message):
     chat_id = message.chat.id
     username = message.from_user.username or "Unknown"
 
-    crypto_monitor.initialize_user(user_id, chat_id, username)
+    await crypto_monitor.initialize_user(user_id, chat_id, username)
     logger.info(f"Пользователь с ID {user_id} начал взаимодействие с ботом.")
     await message.answer(
         "Привет! Я бот, который следит за резкими изменениями цен криптовалют. "
@@ -36,19 +41,21 @@ async def cmd_help(message: Message):
         "/conf - Настроить параметры мониторинга\n"
         "/start_monitor - Запустить мониторинг\n"
         "/stop_monitor - Остановить мониторинг\n"
+        "/rule - Настроить правило алертов\n"
+        "/top - Лидеры роста и падения\n"
     )
     await message.answer(help_message)
 
 @router.message(Command(commands=["start_monitor"]))
 async def cmd_start_monitor(message: Message):
     """Команда /start_monitor для запуска мониторинга."""
-    response_message = await crypto_monitor.start_monitoring()
+    response_message = await crypto_monitor.start_monitoring(message.from_user.id)
     await message.answer(response_message)
 
 @router.message(Command(commands=["stop_monitor"]))
 async def cmd_stop_monitor(message: Message):
     """Команда /stop_monitor для остановки мониторинга."""
-    response_message = await crypto_monitor.stop_monitoring()
+    response_message = await crypto_monitor.stop_monitoring(message.from_user.id)
     await message.answer(response_message)
 
 @router.message(Command(commands=["conf"]))
@@ -68,7 +75,7 @@ async def process_conf_data(message: Message):
         interval, threshold = map(float, message.text.split())
         interval = int(interval)
         
-        await crypto_monitor.update_config(interval, threshold)
+        await crypto_monitor.update_config(message.from_user.id, interval, threshold)
         await message.answer(
             f"Настройки обновлены: интервал проверки = {interval} сек, порог изменения = {threshold}%."
         )
@@ -77,7 +84,49 @@ async def process_conf_data(message: Message):
             "Ошибка: укажите интервал и порог изменения корректно.\nПример: <code>60 5</code>"
         )
 
+@router.message(Command(commands=["rule"]))
+async def cmd_rule(message: Message, command: CommandObject):
+    """Команда /rule для просмотра и установки пользовательского правила алертов."""
+    if command.args:
+        response_message = await crypto_monitor.set_alert_rule(message.from_user.id, command.args)
+        await message.answer(response_message)
+        return
+
+    current_rule = await crypto_monitor.get_alert_rule(message.from_user.id)
+    fields = "\n".join(f"- <code>{name}</code> — {description}" for name, description in FIELDS.items())
+    await message.answer(
+        f"Текущее правило: {f'<code>{html.escape(current_rule)}</code>' if current_rule else 'по порогу из /conf'}\n\n"
+        "Укажите правило после команды. Условия вида <code>поле оператор число</code> "
+        f"({html.escape(' '.join(OPERATORS))}) объединяются через <code>and</code>/<code>or</code> и скобки.\n\n"
+        f"<b>Поля:</b>\n{fields}\n\n"
+        "Пример: <code>/rule change &gt;= 5 and (volume_spike &gt; 50 or price &lt; 0.1)</code>\n"
+        "<code>/rule off</code> — вернуть правило по порогу изменения цены."
+    )
+
+@router.message(Command(commands=["top"]))
+async def cmd_top(message: Message):
+    """Команда /top для вывода лидеров роста и падения по биржам."""
+    response_message = await crypto_monitor.get_top_movers()
+    await message.answer(response_message)
+
+@router.message(Command(commands=["profile"]))
+async def cmd_profile(message: Message, command: CommandObject):
+    """Команда /profile [секунды] для профилирования работающего бота (только для администраторов)."""
+    if message.from_user.id not in ADMIN_IDS:
+        await message.answer("⛔ Команда доступна только администраторам.")
+        return
+
+    try:
+        duration = int(command.args) if command.args else 30
+    except ValueError:
+        await message.answer("Ошибка: укажите длительность в секундах.\nПример: <code>/profile 30</code>")
+        return
+
+    duration = max(1, min(duration, PROFILE_MAX_DURATION))
+    response_message = await crypto_monitor.start_profiling(message.chat.id, duration)
+    await message.answer(response_message)
+
 @router.message(Command(commands=["status"]))
 async def cmd_status(message: Message):
     """Команда /status для показа текущего статуса мониторинга."""
-    await crypto_monitor.get_status()
\ No newline at end of file
+    await crypto_monitor.get_status(message.from_user.id)
\ No newline at end of file
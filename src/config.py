@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import config, Csv
 
 # Настройки для Telegram бота
 TELEGRAM_BOT_TOKEN = config('TELEGRAM_BOT_TOKEN')
@@ -19,4 +19,27 @@ LOG_RETENTION = config('LOG_RETENTION', default='10 days')
 
 # Дополнительные настройки
 CRYPTO_CHECK_INTERVAL = config('CRYPTO_CHECK_INTERVAL', default=60, cast=int)
-PRICE_CHANGE_THRESHOLD = config('PRICE_CHANGE_THRESHOLD', default=100, cast=int)
\ No newline at end of file
+PRICE_CHANGE_THRESHOLD = config('PRICE_CHANGE_THRESHOLD', default=100, cast=int)
+
+# Сохранение состояния мониторинга и тёплый перезапуск
+ALERT_COOLDOWN = config('ALERT_COOLDOWN', default=0, cast=int)
+SESSION_CHECKPOINT_INTERVAL = config('SESSION_CHECKPOINT_INTERVAL', default=60, cast=int)
+RESTART_JITTER = config('RESTART_JITTER', default=5, cast=float)
+
+# Кэш профилей пользователей
+USER_CACHE_SIZE = config('USER_CACHE_SIZE', default=10000, cast=int)
+USER_CACHE_FLUSH_INTERVAL = config('USER_CACHE_FLUSH_INTERVAL', default=0.5, cast=float)
+
+# Максимальный возраст общего снимка тикеров в памяти (сек)
+SNAPSHOT_MAX_AGE = config('SNAPSHOT_MAX_AGE', default=5, cast=float)
+
+# Число монет в рейтингах лидеров роста и падения (/top)
+TOP_MOVERS_COUNT = config('TOP_MOVERS_COUNT', default=10, cast=int)
+
+# Профилирование по запросу (/profile, только для администраторов)
+ADMIN_IDS = config('ADMIN_IDS', default='', cast=Csv(int))
+PROFILE_OUTPUT_DIR = config('PROFILE_OUTPUT_DIR', default='profiles')
+PROFILE_MAX_DURATION = config('PROFILE_MAX_DURATION', default=300, cast=int)
+PROFILE_SAMPLE_INTERVAL = config('PROFILE_SAMPLE_INTERVAL', default=0.005, cast=float)
+PROFILE_SLOW_CALLBACK = config('PROFILE_SLOW_CALLBACK', default=0.1, cast=float)
+PROFILE_TRACEMALLOC_TOP = config('PROFILE_TRACEMALLOC_TOP', default=30, cast=int)
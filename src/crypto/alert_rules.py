@@ -0,0 +1,424 @@
+import bisect
+import heapq
+import math
+import re
+import time
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Any
+
+from src.crypto.ticker import Ticker
+from src.config import TOP_MOVERS_COUNT
+
+
+FIELDS = {
+    "price": "цена последней сделки",
+    "change": "изменение цены за 24 часа, %",
+    "abs_change": "модуль изменения цены за 24 часа, %",
+    "volume": "объём торгов за 24 часа",
+    "turnover": "оборот за 24 часа",
+    "volume_spike": "рост объёма с предыдущего снимка, %",
+    "turnover_spike": "рост оборота с предыдущего снимка, %",
+}
+
+# Оператор сравнения -> (функция поиска границы в отсортированном столбце, подходят ли значения выше границы).
+OPERATORS = {
+    ">": (bisect.bisect_right, True),
+    ">=": (bisect.bisect_left, True),
+    "<": (bisect.bisect_left, False),
+    "<=": (bisect.bisect_right, False),
+}
+
+KEYWORDS = {
+    "and": "and", "и": "and", "&": "and", "&&": "and",
+    "or": "or", "или": "or", "|": "or", "||": "or",
+}
+
+TOKEN_PATTERN = re.compile(r">=|<=|&&|\|\||[()<>&|]|[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?|\w+", re.UNICODE)
+
+# Максимальная глубина вложенности скобок в правиле (защита от переполнения стека рекурсивного парсера).
+MAX_RULE_DEPTH = 32
+
+# Число разобранных текстов правил, хранимых в памяти (одинаковые правила разных пользователей разбираются один раз).
+PARSE_CACHE_SIZE = 1024
+
+# Узел правила — кортеж: ("cmp", поле, оператор, число) или ("and" | "or", (дочерние узлы...)).
+RuleNode = Tuple[Any, ...]
+
+
+class RuleParseError(ValueError):
+    """Ошибка разбора пользовательского правила алерта."""
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст правила на токены."""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        if text[position].isspace():
+            position += 1
+            continue
+
+        match = TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise RuleParseError(f"Непонятный символ в позиции {position + 1}: '{text[position]}'")
+        tokens.append(match.group().lower())
+        position = match.end()
+    return tokens
+
+
+def combine(kind: str, children: List[RuleNode]) -> RuleNode:
+    """Строит канонический узел AND/OR: вложенные узлы того же типа раскрываются, дубликаты удаляются, порядок фиксируется."""
+    flat = set()
+    for child in children:
+        if child[0] == kind:
+            flat.update(child[1])
+        else:
+            flat.add(child)
+
+    if len(flat) == 1:
+        return flat.pop()
+    return kind, tuple(sorted(flat, key=repr))
+
+
+class RuleParser:
+    """Парсер правил вида 'change >= 5 and (volume_spike > 50 or price < 0.1)'."""
+
+    def __init__(self, text: str):
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise RuleParseError("Неожиданный конец правила")
+        self.position += 1
+        return token
+
+    def parse(self) -> RuleNode:
+        if not self.tokens:
+            raise RuleParseError("Пустое правило")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise RuleParseError(f"Лишний токен: '{self.peek()}'")
+        return node
+
+    def parse_or(self) -> RuleNode:
+        children = [self.parse_and()]
+        while KEYWORDS.get(self.peek()) == "or":
+            self.take()
+            children.append(self.parse_and())
+        return combine("or", children)
+
+    def parse_and(self) -> RuleNode:
+        children = [self.parse_atom()]
+        while KEYWORDS.get(self.peek()) == "and":
+            self.take()
+            children.append(self.parse_atom())
+        return combine("and", children)
+
+    def parse_atom(self) -> RuleNode:
+        token = self.take()
+        if token == "(":
+            if self.depth >= MAX_RULE_DEPTH:
+                raise RuleParseError(f"Слишком глубокая вложенность скобок (максимум {MAX_RULE_DEPTH})")
+            self.depth += 1
+            node = self.parse_or()
+            self.depth -= 1
+            if self.take() != ")":
+                raise RuleParseError("Ожидалась закрывающая скобка")
+            return node
+
+        if token not in FIELDS:
+            raise RuleParseError(f"Неизвестное поле: '{token}'. Доступные поля: {', '.join(FIELDS)}")
+
+        op = self.take()
+        if op not in OPERATORS:
+            raise RuleParseError(f"Ожидался оператор сравнения ({', '.join(OPERATORS)}), получено '{op}'")
+
+        value = self.take()
+        try:
+            number = float(value)
+        except ValueError:
+            raise RuleParseError(f"Ожидалось число, получено '{value}'")
+
+        if not math.isfinite(number):
+            raise RuleParseError(f"Ожидалось конечное число, получено '{value}'")
+        return "cmp", token, op, number
+
+
+def parse_rule(text: str) -> RuleNode:
+    """Разбирает текст правила в канонический узел."""
+    return RuleParser(text).parse()
+
+
+def threshold_rule(threshold: float) -> RuleNode:
+    """Правило по умолчанию: модуль изменения цены за 24 часа не меньше порога."""
+    return "cmp", "abs_change", ">=", float(threshold)
+
+
+class MarketSnapshot:
+    """Колоночное представление тикеров одной биржи для векторной проверки правил."""
+
+    def __init__(self, exchange_name: str, tickers: List[Ticker], previous: Optional["MarketSnapshot"] = None,
+                 top_count: int = TOP_MOVERS_COUNT):
+        """
+        :param exchange_name: Название биржи.
+        :param tickers: Нормализованные тикеры биржи.
+        :param previous: Предыдущий снимок той же биржи для расчёта всплесков объёма и оборота.
+        :param top_count: Размер рейтингов лидеров роста и падения.
+        """
+        self.exchange_name = exchange_name
+        self.tickers = tickers
+        self.fetched_at: Optional[float] = None
+        self.created_at = time.monotonic()
+
+        change = [ticker.price_change for ticker in tickers]
+        volume = [ticker.volume for ticker in tickers]
+        turnover = [ticker.turnover for ticker in tickers]
+        self.columns: Dict[str, List[float]] = {
+            "price": [ticker.last_price for ticker in tickers],
+            "change": change,
+            "abs_change": [abs(value) for value in change],
+            "volume": volume,
+            "turnover": turnover,
+            "volume_spike": self.spike(tickers, volume, previous, "volume"),
+            "turnover_spike": self.spike(tickers, turnover, previous, "turnover"),
+        }
+        self.results: Dict[int, Dict[int, int]] = {}
+        self.sorted_columns: Dict[str, Tuple[List[float], List[int]]] = {}
+
+        rising = [index for index, value in enumerate(change) if math.isfinite(value) and value > 0]
+        falling = [index for index, value in enumerate(change) if math.isfinite(value) and value < 0]
+        self.top_gainers = [tickers[index] for index in heapq.nlargest(top_count, rising, key=change.__getitem__)]
+        self.top_losers = [tickers[index] for index in heapq.nsmallest(top_count, falling, key=change.__getitem__)]
+
+    @staticmethod
+    def spike(tickers: List[Ticker], values: List[float], previous: Optional["MarketSnapshot"], field: str) -> List[float]:
+        """Процентный рост значения поля относительно предыдущего снимка (NaN, если сравнивать не с чем)."""
+        if previous is None:
+            return [math.nan] * len(values)
+
+        previous_values = dict(zip((ticker.symbol for ticker in previous.tickers), previous.columns[field]))
+        spikes = []
+        for ticker, value in zip(tickers, values):
+            previous_value = previous_values.get(ticker.symbol)
+            if previous_value:
+                spikes.append((value - previous_value) / previous_value * 100)
+            else:
+                spikes.append(math.nan)
+        return spikes
+
+    def sorted_column(self, field: str) -> Tuple[List[float], List[int]]:
+        """
+        Отсортированные значения поля (без NaN) и префиксные битовые маски к ним.
+
+        Маска prefixes[k] содержит тикеры с k наименьшими значениями. Строится один раз на снимок и поле.
+        """
+        cached = self.sorted_columns.get(field)
+        if cached is not None:
+            return cached
+
+        column = self.columns[field]
+        order = sorted((index for index, value in enumerate(column) if not math.isnan(value)), key=column.__getitem__)
+        values = [column[index] for index in order]
+        prefixes = [0]
+        mask = 0
+        for index in order:
+            mask |= 1 << index
+            prefixes.append(mask)
+
+        cached = self.sorted_columns[field] = (values, prefixes)
+        return cached
+
+    def mask(self, field: str, op: str, value: float) -> int:
+        """
+        Битовая маска строк, удовлетворяющих сравнению (бит i соответствует тикеру i).
+
+        Граница находится бинарным поиском по отсортированному столбцу, поэтому каждый новый порог
+        стоит O(log n), а не полного прохода по тикерам. NaN не удовлетворяет ни одному сравнению.
+        """
+        if math.isnan(value):
+            return 0
+
+        search, above = OPERATORS[op]
+        values, prefixes = self.sorted_column(field)
+        position = search(values, value)
+        return prefixes[-1] ^ prefixes[position] if above else prefixes[position]
+
+
+class AlertRulePlan:
+    """
+    Общий план проверки правил всех пользователей.
+
+    Одинаковые подвыражения разных пользователей сворачиваются в один шаг,
+    поэтому стоимость проверки снимка растёт с числом различных условий, а не пользователей.
+    Версия плана меняется только при появлении нового шага или нового корня.
+    """
+
+    def __init__(self, rules: Dict[int, RuleNode], version: int = 0):
+        self.version = version
+        self.node_ids: Dict[RuleNode, int] = {}
+        self.steps: List[RuleNode] = []
+        self.roots: Dict[int, int] = {}
+        self.root_refs: Dict[int, int] = {}
+        self.released_roots = 0
+
+        for user_id, node in rules.items():
+            self.assign(user_id, node)
+
+    def intern(self, node: RuleNode) -> int:
+        """Добавляет узел и его подвыражения в план, возвращая номер шага."""
+        node_id = self.node_ids.get(node)
+        if node_id is not None:
+            return node_id
+
+        if node[0] == "cmp":
+            step = node
+        else:
+            step = (node[0], tuple(self.intern(child) for child in node[1]))
+
+        node_id = len(self.steps)
+        self.steps.append(step)
+        self.node_ids[node] = node_id
+        return node_id
+
+    def assign(self, user_id: int, node: RuleNode):
+        """Привязывает правило пользователя к шагу плана."""
+        root_id = self.intern(node)
+        if root_id not in self.root_refs:
+            self.root_refs[root_id] = 0
+            self.version += 1
+        self.root_refs[root_id] += 1
+        self.roots[user_id] = root_id
+
+    def release(self, user_id: int):
+        """Отвязывает пользователя от плана; неиспользуемые шаги остаются до перекомпиляции."""
+        root_id = self.roots.pop(user_id, None)
+        if root_id is None:
+            return
+
+        self.root_refs[root_id] -= 1
+        if not self.root_refs[root_id]:
+            del self.root_refs[root_id]
+            self.released_roots += 1
+
+    def evaluate(self, snapshot: MarketSnapshot) -> Dict[int, int]:
+        """
+        Выполняет план над снимком (один раз на снимок и версию плана).
+
+        :return: Словарь {номер корневого шага: битовая маска подходящих тикеров}.
+        """
+        results = snapshot.results.get(self.version)
+        if results is None:
+            results = self.execute(snapshot, list(self.steps), list(self.root_refs))
+            snapshot.results = {self.version: results}
+        return results
+
+    @staticmethod
+    def execute(snapshot: MarketSnapshot, steps: List[RuleNode], root_ids: List[int]) -> Dict[int, int]:
+        """
+        Выполняет копию шагов плана над снимком.
+
+        Не обращается к изменяемому состоянию плана, поэтому может выполняться в пуле потоков.
+
+        :param snapshot: Снимок тикеров биржи.
+        :param steps: Шаги плана.
+        :param root_ids: Номера корневых шагов, для которых нужен результат.
+        :return: Словарь {номер корневого шага: битовая маска подходящих тикеров}.
+        """
+        masks = []
+        for step in steps:
+            if step[0] == "cmp":
+                masks.append(snapshot.mask(step[1], step[2], step[3]))
+            elif step[0] == "and":
+                mask = masks[step[1][0]]
+                for child in step[1][1:]:
+                    mask &= masks[child]
+                masks.append(mask)
+            else:
+                mask = 0
+                for child in step[1]:
+                    mask |= masks[child]
+                masks.append(mask)
+
+        return {root_id: masks[root_id] for root_id in root_ids}
+
+
+class AlertRuleEngine:
+    """Реестр правил пользователей поверх общего плана проверки."""
+
+    def __init__(self, parse_cache_size: int = PARSE_CACHE_SIZE):
+        """
+        :param parse_cache_size: Максимальное число разобранных текстов правил в LRU-кэше.
+        """
+        self.rules: Dict[int, RuleNode] = {}
+        self.sources: Dict[int, Tuple[str, float]] = {}
+        self.parse_cache_size = parse_cache_size
+        self.parsed: "OrderedDict[str, RuleNode]" = OrderedDict()
+        self.plan = AlertRulePlan({})
+
+    def parse(self, text: str) -> RuleNode:
+        """Разбирает правило, переиспользуя результат для недавно встречавшихся текстов."""
+        node = self.parsed.get(text)
+        if node is not None:
+            self.parsed.move_to_end(text)
+            return node
+
+        node = self.parsed[text] = parse_rule(text)
+        while len(self.parsed) > self.parse_cache_size:
+            self.parsed.popitem(last=False)
+        return node
+
+    def set_rule(self, user_id: int, rule_text: str, threshold: float):
+        """
+        Регистрирует правило пользователя.
+
+        :param user_id: Идентификатор пользователя.
+        :param rule_text: Текст правила; пустая строка — правило по порогу изменения цены.
+        :param threshold: Порог изменения цены в процентах для правила по умолчанию.
+        """
+        source = (rule_text, threshold)
+        if self.sources.get(user_id) == source:
+            return
+
+        node = self.parse(rule_text) if rule_text else threshold_rule(threshold)
+        self.sources[user_id] = source
+        if self.rules.get(user_id) == node:
+            return
+
+        self.plan.release(user_id)
+        self.rules[user_id] = node
+        self.plan.assign(user_id, node)
+        self.compact_if_needed()
+
+    def remove_rule(self, user_id: int):
+        """Исключает пользователя из плана проверки."""
+        self.sources.pop(user_id, None)
+        if self.rules.pop(user_id, None) is not None:
+            self.plan.release(user_id)
+            self.compact_if_needed()
+
+    def compact_if_needed(self):
+        """Перекомпилирует план, когда неиспользуемых корней становится больше, чем используемых."""
+        if self.plan.released_roots > max(16, len(self.plan.root_refs)):
+            self.plan = AlertRulePlan(self.rules, self.plan.version + 1)
+
+    def matches(self, snapshot: MarketSnapshot, user_id: int) -> List[Ticker]:
+        """Возвращает тикеры снимка, удовлетворяющие правилу пользователя."""
+        root_id = self.plan.roots.get(user_id)
+        if root_id is None:
+            return []
+
+        mask = self.plan.evaluate(snapshot)[root_id]
+        tickers = []
+        while mask:
+            lowest = mask & -mask
+            tickers.append(snapshot.tickers[lowest.bit_length() - 1])
+            mask ^= lowest
+        return tickers
@@ -1,199 +1,481 @@
 import asyncio
+import html
+import random
+import time
 
 from aiogram import Bot
-from typing import List
+from typing import Dict, List, Optional, Set
 
+from src.crypto.alert_rules import AlertRuleEngine, AlertRulePlan, MarketSnapshot, RuleParseError
 from src.crypto.exchange import Exchange
-from src.utils.redis_manager import RedisChatManager, RedisCacheManager
+from src.crypto.ticker import Ticker
+from src.crypto.monitoring_session import MonitoringSession
+from src.utils.redis_manager import RedisChatManager, RedisCacheManager, RedisSessionStateManager
+from src.utils.profile_cache import UserProfileCache
+from src.utils.profiling import Profiler
 
 from src.utils.logging_config import logger
-from src.config import CRYPTO_CHECK_INTERVAL, PRICE_CHANGE_THRESHOLD
+from src.config import ALERT_COOLDOWN, SESSION_CHECKPOINT_INTERVAL, RESTART_JITTER, SNAPSHOT_MAX_AGE
 
 
 class CryptoPriceMonitor:
-    """Основной класс для мониторинга изменений на криптовалютных биржах и отправки уведомлений пользователю."""
-    
+    """Основной класс для мониторинга изменений на криптовалютных биржах и отправки уведомлений пользователям."""
+
     def __init__(self, exchanges: List[Exchange], bot: Bot):
         """
         Инициализация класса для мониторинга цен.
-        
+
         :param exchanges: Список криптовалютных бирж для отслеживания.
         :param bot: Экземпляр Telegram бота.
         """
         self.exchanges = exchanges
         self.bot = bot
-        self.user_id = None
-        self.chat_id = None
-        self.username = None
-        self.is_monitoring_active = False
-        
-        self.check_interval = CRYPTO_CHECK_INTERVAL
-        self.price_change_threshold = PRICE_CHANGE_THRESHOLD
+        self.sessions: Dict[int, MonitoringSession] = {}
+        self.stopped_sessions: Set[int] = set()
 
         self.chat_manager = RedisChatManager()
         self.cache_manager = RedisCacheManager()
+        self.state_manager = RedisSessionStateManager()
+        self.profiles = UserProfileCache(self.chat_manager)
+
+        self.rules = AlertRuleEngine()
+        self.snapshots: Dict[str, MarketSnapshot] = {}
+        self.snapshot_locks: Dict[str, asyncio.Lock] = {}
+        self.evaluation_lock = asyncio.Lock()
 
-    def initialize_user(self, user_id: int, chat_id: int, username: str):
+    async def initialize_user(self, user_id: int, chat_id: int, username: str):
         """Инициализация данных пользователя при запуске бота и сохранение данных в Redis."""
-        self.user_id = user_id
-        self.chat_id = chat_id
-        self.username = username
-        self.chat_manager.add_user(user_id, chat_id, username)
-        logger.info(f"Пользователь инициализирован: user_id={user_id}, chat_id={chat_id}, username={username}")
+        session = self.sessions.get(user_id)
+        if session:
+            session.chat_id = chat_id
+            session.username = username
 
-    def update_user_if_needed(self):
-        """Обновляет данные пользователя в Redis при их изменении."""
-        stored_data = self.chat_manager.get_user_data(self.user_id)
-        if stored_data:
-            if stored_data.get('chat_id') != self.chat_id or stored_data.get('username') != self.username:
-                self.chat_manager.add_user(self.user_id, self.chat_id, self.username)
-                logger.info(f"Данные пользователя обновлены: user_id={self.user_id}")
+        if await self.profiles.get(user_id):
+            self.profiles.update(user_id, {"chat_id": chat_id, "username": username})
         else:
-            logger.warning(f"Нет данных для user_id={self.user_id}, требуется инициализация через /start")
+            profile = MonitoringSession(user_id, chat_id, username).to_profile()
+            self.profiles.put(user_id, profile)
+            self.profiles.update(user_id, profile)
+        logger.info(f"Пользователь инициализирован: user_id={user_id}, chat_id={chat_id}, username={username}")
 
-    async def monitor_price_changes(self):
-        """Асинхронный метод для отслеживания изменений цен с уведомлением пользователя."""
-        self.is_monitoring_active = True
+    async def get_session(self, user_id: int) -> Optional[MonitoringSession]:
+        """
+        Возвращает сессию пользователя.
 
-        if not self.chat_id:
-            logger.warning(f"Не найден chat_id для пользователя {self.user_id}")
-            return
+        В памяти постоянно хранятся только сессии с запущенным мониторингом; для остальных пользователей
+        сессия строится по профилю из ограниченного кэша UserProfileCache и не сохраняется.
+        """
+        session = self.sessions.get(user_id)
+        if session:
+            return session
 
-        while self.is_monitoring_active:
-            for exchange in self.exchanges:
-                logger.info(f"Получение данных с биржи {exchange.get_exchange_name()}...")
+        profile = await self.profiles.get(user_id)
+        if not profile:
+            logger.warning(f"Нет данных для user_id={user_id}, требуется инициализация через /start")
+            return None
 
-                cache_key = exchange.get_exchange_name()
-                cached_data = self.cache_manager.get_data(cache_key)
+        return self.sessions.get(user_id) or MonitoringSession.from_profile(user_id, profile)
 
-                if not cached_data:
-                    data = await asyncio.get_running_loop().run_in_executor(None, exchange.fetch_market_data)
-                    self.cache_manager.save_data(cache_key, data, ttl=300)
+    async def get_snapshot(self, exchange: Exchange) -> MarketSnapshot:
+        """
+        Возвращает общий для всех пользователей снимок тикеров биржи.
+
+        Снимок обновляется не чаще раза в SNAPSHOT_MAX_AGE секунд; если данные в кэше Redis не изменились
+        или биржа не вернула данных, переиспользуется прежний снимок вместе с уже вычисленными результатами правил.
+        """
+        exchange_name = exchange.get_exchange_name()
+        lock = self.snapshot_locks.setdefault(exchange_name, asyncio.Lock())
+
+        async with lock:
+            snapshot = self.snapshots.get(exchange_name)
+            if snapshot and time.monotonic() - snapshot.created_at < SNAPSHOT_MAX_AGE:
+                return snapshot
+
+            logger.info(f"Получение данных с биржи {exchange_name}...")
+            loop = asyncio.get_running_loop()
+            cached = await loop.run_in_executor(None, self.cache_manager.get_tickers, exchange_name)
+
+            if cached:
+                fetched_at, tickers = cached
+            else:
+                tickers = await loop.run_in_executor(None, exchange.fetch_tickers)
+                if tickers:
+                    fetched_at = await loop.run_in_executor(None, self.cache_manager.save_tickers, exchange_name, tickers, 300)
+                elif snapshot:
+                    logger.warning(f"Биржа {exchange_name} не вернула данных, используется предыдущий снимок")
+                    snapshot.created_at = time.monotonic()
+                    return snapshot
                 else:
-                    data = cached_data
+                    fetched_at = time.time()
+
+            if snapshot and snapshot.fetched_at == fetched_at:
+                snapshot.created_at = time.monotonic()
+                return snapshot
 
-                significant_changes = await asyncio.get_running_loop().run_in_executor(
-                    None,
-                    exchange.filter_significant_changes,
-                    data,
-                    self.price_change_threshold
+            new_snapshot = await loop.run_in_executor(None, MarketSnapshot, exchange_name, tickers, snapshot)
+            new_snapshot.fetched_at = fetched_at
+            self.snapshots[exchange_name] = new_snapshot
+            return new_snapshot
+
+    async def match_rules(self, snapshot: MarketSnapshot, user_id: int) -> List[Ticker]:
+        """
+        Возвращает тикеры снимка, удовлетворяющие правилу пользователя.
+
+        План правил выполняется в пуле потоков один раз на снимок и версию плана; остальные
+        пользователи ждут готовый результат, не блокируя event loop.
+        """
+        async with self.evaluation_lock:
+            while self.rules.plan.version not in snapshot.results:
+                plan = self.rules.plan
+                version, steps, root_ids = plan.version, list(plan.steps), list(plan.root_refs)
+                results = await asyncio.get_running_loop().run_in_executor(
+                    None, AlertRulePlan.execute, snapshot, steps, root_ids
                 )
+                snapshot.results = {version: results}
+
+        return self.rules.matches(snapshot, user_id)
+
+    async def monitor_price_changes(self, session: MonitoringSession, initial_delay: float = 0):
+        """
+        Асинхронный метод для отслеживания изменений цен с уведомлением пользователя.
+
+        :param session: Сессия мониторинга пользователя.
+        :param initial_delay: Задержка перед первой проверкой (используется при тёплом перезапуске).
+        """
+        session.is_monitoring_active = True
+
+        if not session.chat_id:
+            logger.warning(f"Не найден chat_id для пользователя {session.user_id}")
+            return
+
+        if initial_delay > 0:
+            await asyncio.sleep(initial_delay)
+
+        while session.is_monitoring_active:
+            session.last_run_at = time.time()
+            if ALERT_COOLDOWN:
+                session.prune_alerts(session.last_run_at, ALERT_COOLDOWN)
+
+            self.rules.set_rule(session.user_id, session.alert_rule, session.price_change_threshold)
+
+            for exchange in self.exchanges:
+                snapshot = await self.get_snapshot(exchange)
+                significant_changes = await self.match_rules(snapshot, session.user_id)
 
                 exchange_name = exchange.get_exchange_name()
                 if significant_changes:
                     for coin in significant_changes:
+                        if ALERT_COOLDOWN and not session.should_alert(
+                                f"{exchange_name}:{coin.symbol}", session.last_run_at, ALERT_COOLDOWN):
+                            continue
                         await self.send_notification(
-                            symbol=coin['symbol'],
-                            price_change=coin['price_change'],
-                            last_price=coin['last_price'],
+                            chat_id=session.chat_id,
+                            ticker=coin,
                             exchange_name=exchange_name
                         )
                 else:
-                    await self.send_notification(exchange_name=exchange_name, has_changes=False)
+                    await self.send_notification(chat_id=session.chat_id, exchange_name=exchange_name, has_changes=False)
 
-            await asyncio.sleep(self.check_interval)
+            await asyncio.sleep(session.check_interval)
 
-    async def send_notification(self, symbol: str = None, price_change: float = None,
-                                last_price: float = None, has_changes: bool = True,
+    async def send_notification(self, chat_id: int, ticker: Optional[Ticker] = None, has_changes: bool = True,
                                 exchange_name: str = ""):
         """Отправляет уведомление пользователю о значительных изменениях цен или их отсутствии."""
-        if not self.chat_id:
+        if not chat_id:
             logger.warning("Невозможно отправить уведомление: отсутствует chat_id.")
             return
 
         if has_changes:
-            message = (f"🚨 На бирже <b>{exchange_name}</b> монета <b>{symbol}</b> изменилась на "
-                       f"{price_change:.2f}%! Текущая цена: {last_price:.2f}")
+            message = (f"🚨 На бирже <b>{exchange_name}</b> монета <b>{ticker.symbol}</b> изменилась на "
+                       f"{ticker.price_change:.2f}%! Текущая цена: {ticker.last_price:.2f}")
         else:
             message = f"На бирже <b>{exchange_name}</b> существенных изменений в ценах криптовалют не обнаружено."
 
-        await self.bot.send_message(chat_id=self.chat_id, text=message)
+        await self.bot.send_message(chat_id=chat_id, text=message)
 
 
 class CryptoBotController(CryptoPriceMonitor):
     """Класс для управления ботом и его командами, включая контроль мониторинга цен."""
-    
+
     def __init__(self, exchanges: List[Exchange], bot: Bot):
         super().__init__(exchanges, bot)
-        self.monitoring_task = None
+        self.checkpoint_task = None
+        self.refresh_tasks = set()
+        self.profiler = Profiler()
+        self.profiling_task = None
 
-    async def start_monitoring(self):
-        """Запускает мониторинг изменений цен асинхронно."""
-        self.update_user_if_needed()
+    def launch_monitoring(self, session: MonitoringSession, initial_delay: float = 0):
+        """Создаёт задачу мониторинга для сессии."""
+        session.monitoring_task = asyncio.create_task(self.monitor_price_changes(session, initial_delay))
+        session.is_monitoring_active = True
 
-        if self.is_monitoring_active and self.monitoring_task and not self.monitoring_task.done():
-            logger.info(f"Попытка повторного запуска мониторинга для пользователя {self.user_id}")
+    async def start_monitoring(self, user_id: int):
+        """Запускает мониторинг изменений цен асинхронно."""
+        session = await self.get_session(user_id)
+        if not session:
+            return "⚠️ Пользователь не найден. Используйте /start, чтобы начать работу с ботом."
+
+        session = self.sessions.setdefault(user_id, session)
+        self.stopped_sessions.discard(user_id)
+        if session.is_running():
+            logger.info(f"Попытка повторного запуска мониторинга для пользователя {user_id}")
             message = "⚠️ Мониторинг уже запущен. Нет необходимости запускать его повторно."
         else:
-            logger.info(f"Запуск мониторинга для пользователя {self.user_id}")
-            self.monitoring_task = asyncio.create_task(self.monitor_price_changes())
-            self.is_monitoring_active = True
+            logger.info(f"Запуск мониторинга для пользователя {user_id}")
+            self.launch_monitoring(session)
             message = "✅ Мониторинг криптовалют успешно запущен!"
 
-        self.chat_manager.set_monitoring_status(self.user_id, True)
+        self.profiles.update(user_id, {"is_monitoring_active": True})
         return message
 
-    async def stop_monitoring(self):
+    async def stop_monitoring(self, user_id: int):
         """Останавливает мониторинг изменений цен асинхронно."""
-        self.update_user_if_needed()
+        session = await self.get_session(user_id)
+        if not session:
+            return "⚠️ Пользователь не найден. Используйте /start, чтобы начать работу с ботом."
+
+        self.sessions.pop(user_id, None)
+        self.stopped_sessions.add(user_id)
+        self.rules.remove_rule(user_id)
 
-        if not self.is_monitoring_active or not self.monitoring_task or self.monitoring_task.done():
-            logger.info(f"Попытка повторной остановки мониторинга для пользователя {self.user_id}")
+        if not session.is_running():
+            logger.info(f"Попытка повторной остановки мониторинга для пользователя {user_id}")
             message = "⚠️ Мониторинг уже остановлен. Нет необходимости останавливать его повторно."
         else:
-            logger.info(f"Остановка мониторинга для пользователя {self.user_id}")
-            self.monitoring_task.cancel()
-            self.is_monitoring_active = False
+            logger.info(f"Остановка мониторинга для пользователя {user_id}")
+            session.monitoring_task.cancel()
+            session.is_monitoring_active = False
 
             try:
-                await self.monitoring_task
+                await session.monitoring_task
             except asyncio.CancelledError:
                 logger.info("Задача мониторинга успешно отменена.")
-            
+
             message = "🛑 Мониторинг криптовалют успешно остановлен!"
-        
-        self.chat_manager.set_monitoring_status(self.user_id, False)
+
+        self.profiles.update(user_id, {"is_monitoring_active": False})
         return message
 
-    async def update_config(self, check_interval: int, price_change_threshold: float):
+    async def update_config(self, user_id: int, check_interval: int, price_change_threshold: float):
         """Асинхронно обновляет параметры мониторинга."""
-        self.update_user_if_needed()
-        self.check_interval = check_interval
-        self.price_change_threshold = price_change_threshold
-        logger.info(f"Обновлены параметры мониторинга: интервал = {self.check_interval} сек, порог изменения цены = {self.price_change_threshold}%")
+        session = await self.get_session(user_id)
+        if not session:
+            return
+
+        session.check_interval = check_interval
+        session.price_change_threshold = price_change_threshold
+        self.profiles.update(user_id, {"check_interval": check_interval, "price_change_threshold": price_change_threshold})
+        logger.info(f"Обновлены параметры мониторинга для пользователя {user_id}: интервал = {check_interval} сек, порог изменения цены = {price_change_threshold}%")
 
-    async def get_status(self):
+    async def get_alert_rule(self, user_id: int) -> Optional[str]:
+        """Возвращает текст пользовательского правила алертов (пустая строка — правило по порогу)."""
+        session = await self.get_session(user_id)
+        return session.alert_rule if session else None
+
+    async def set_alert_rule(self, user_id: int, rule_text: str) -> str:
+        """
+        Устанавливает пользовательское правило алертов.
+
+        :param user_id: Идентификатор пользователя.
+        :param rule_text: Текст правила; 'off' возвращает правило по порогу изменения цены.
+        :return: Сообщение для пользователя.
+        """
+        session = await self.get_session(user_id)
+        if not session:
+            return "⚠️ Пользователь не найден. Используйте /start, чтобы начать работу с ботом."
+
+        rule_text = rule_text.strip()
+        if rule_text.lower() in ("off", "выкл"):
+            rule_text = ""
+
+        if rule_text:
+            try:
+                self.rules.parse(rule_text)
+            except RuleParseError as e:
+                return f"⚠️ Ошибка в правиле: {html.escape(str(e))}"
+
+        session.alert_rule = rule_text
+        self.profiles.update(user_id, {"alert_rule": rule_text})
+        logger.info(f"Обновлено правило алертов для пользователя {user_id}: {rule_text or 'по порогу'}")
+
+        if rule_text:
+            return f"✅ Правило алертов установлено: <code>{html.escape(rule_text)}</code>"
+        return "✅ Алерты снова срабатывают по порогу изменения цены из /conf."
+
+    def refresh_snapshot_in_background(self, exchange: Exchange):
+        """Обновляет снимок биржи в фоне, если обновление ещё не выполняется."""
+        lock = self.snapshot_locks.get(exchange.get_exchange_name())
+        if lock and lock.locked():
+            return
+
+        task = asyncio.create_task(self.get_snapshot(exchange), name=f"refresh-snapshot-{exchange.get_exchange_name()}")
+        self.refresh_tasks.add(task)
+        task.add_done_callback(self.on_refresh_done)
+
+    def on_refresh_done(self, task: asyncio.Task):
+        """Убирает завершённую задачу фонового обновления и логирует её ошибку."""
+        self.refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Ошибка фонового обновления снимка ({task.get_name()}): {task.exception()}")
+
+    @staticmethod
+    def format_movers(tickers: List[Ticker]) -> str:
+        """Форматирует рейтинг монет для сообщения."""
+        if not tickers:
+            return "нет данных"
+        return "\n".join(
+            f"{position}. {html.escape(ticker.symbol)} {ticker.price_change:+.2f}% ({ticker.last_price:.8g})"
+            for position, ticker in enumerate(tickers, start=1)
+        )
+
+    @staticmethod
+    def format_snapshot_time(fetched_at: float) -> str:
+        """Форматирует время получения данных снимка и их возраст."""
+        age = max(0, int(time.time() - fetched_at))
+        if age < 60:
+            age_text = f"{age} сек"
+        elif age < 3600:
+            age_text = f"{age // 60} мин"
+        else:
+            age_text = f"{age // 3600} ч {age % 3600 // 60} мин"
+        return f"🕒 Данные на {time.strftime('%d.%m %H:%M:%S', time.localtime(fetched_at))} ({age_text} назад)"
+
+    async def get_top_movers(self) -> str:
+        """
+        Возвращает лидеров роста и падения по каждой бирже.
+
+        Рейтинги рассчитываются при построении снимка, поэтому ответ не зависит от размера рынка;
+        устаревший или отсутствующий снимок обновляется в фоне.
+        """
+        sections = []
+        for exchange in self.exchanges:
+            exchange_name = exchange.get_exchange_name()
+            snapshot = self.snapshots.get(exchange_name)
+
+            if not snapshot or time.monotonic() - snapshot.created_at >= SNAPSHOT_MAX_AGE:
+                self.refresh_snapshot_in_background(exchange)
+
+            if not snapshot:
+                sections.append(f"<b>{exchange_name}</b>: данные ещё загружаются, повторите запрос через несколько секунд.")
+                continue
+
+            sections.append(
+                f"📈 <b>{exchange_name}</b> — лидеры роста:\n{self.format_movers(snapshot.top_gainers)}\n\n"
+                f"📉 <b>{exchange_name}</b> — лидеры падения:\n{self.format_movers(snapshot.top_losers)}\n"
+                f"{self.format_snapshot_time(snapshot.fetched_at)}"
+            )
+
+        return "\n\n".join(sections)
+
+    async def start_profiling(self, chat_id: int, duration: int) -> str:
+        """
+        Запускает профилирование работающего бота в фоне; отчёты отправляются в чат по завершении.
+
+        :param chat_id: Чат для отправки результатов.
+        :param duration: Длительность окна профилирования в секундах.
+        """
+        if self.profiler.is_running or (self.profiling_task and not self.profiling_task.done()):
+            return "⚠️ Профилирование уже выполняется."
+
+        self.profiling_task = asyncio.create_task(self.run_profiling(chat_id, duration))
+        return f"🔬 Профилирование запущено на {duration} сек."
+
+    async def run_profiling(self, chat_id: int, duration: int):
+        """Выполняет профилирование и отправляет пути к отчётам."""
+        try:
+            reports = await self.profiler.run(duration)
+        except Exception as e:
+            logger.error(f"Ошибка профилирования: {e}")
+            await self.bot.send_message(chat_id=chat_id, text=f"⚠️ Ошибка профилирования: {html.escape(str(e))}")
+            return
+
+        report_lines = "\n".join(f"- {name}: <code>{html.escape(path)}</code>" for name, path in reports.items())
+        await self.bot.send_message(chat_id=chat_id, text=f"✅ Профилирование завершено. Отчёты:\n{report_lines}")
+
+    async def get_status(self, user_id: int):
         """Отправляет статус мониторинга пользователю."""
-        self.update_user_if_needed()
-        if not self.chat_id:
-            logger.warning(f"Не задан chat_id для пользователя {self.user_id}.")
+        session = await self.get_session(user_id)
+        if not session:
+            return
+
+        if not session.chat_id:
+            logger.warning(f"Не задан chat_id для пользователя {user_id}.")
             return
 
         status_message = (
             f"📊 <b>Статус мониторинга</b>\n"
-            f"Активен: {'Да' if self.is_monitoring_active else 'Нет'}\n"
-            f"Интервал проверки: {self.check_interval} сек\n"
-            f"Порог изменения цены: {self.price_change_threshold}%"
+            f"Активен: {'Да' if session.is_running() else 'Нет'}\n"
+            f"Интервал проверки: {session.check_interval} сек\n"
+            f"Порог изменения цены: {session.price_change_threshold}%\n"
+            f"Правило алертов: {html.escape(session.alert_rule) if session.alert_rule else 'по порогу'}"
         )
-        await self.bot.send_message(chat_id=self.chat_id, text=status_message)
+        await self.bot.send_message(chat_id=session.chat_id, text=status_message)
 
     async def restart_active_sessions(self):
-        """Инициализирует все данные из Redis и перезапускает мониторинг для пользователей с активным статусом мониторинга."""
+        """
+        Инициализирует все данные из Redis и возобновляет мониторинг для пользователей с активным статусом.
+
+        Сессии продолжают работу с сохранённой фазы расписания; если фаза неизвестна или уже пропущена,
+        первая проверка назначается в случайный момент своего интервала. Дополнительная случайная
+        задержка (RESTART_JITTER) разносит одновременные запуски.
+        """
         all_users = self.chat_manager.get_all_chats()
-        
+        states = self.state_manager.get_all_states()
+        now = time.time()
+
         for user_id, user_data in all_users.items():
-            self.user_id = user_id
-            self.chat_id = int(user_data['chat_id'])
-            self.username = user_data['username']
-            self.is_monitoring_active = user_data['is_monitoring_active']
-
-            self.is_monitoring_active = bool(int(user_data.get('is_monitoring_active', '0')))
-            
-            logger.info(f"Инициализация данных для пользователя: user_id={user_id}, chat_id={self.chat_id}, мониторинг активен={self.is_monitoring_active}")
-
-            if self.is_monitoring_active:
-                try:
-                    logger.info(f"Перезапуск мониторинга для пользователя: user_id={user_id}, chat_id={self.chat_id}")
-                    await self.start_monitoring()
-                except Exception as e:
-                    logger.error(f"Ошибка при перезапуске мониторинга для пользователя {user_id}: {e}")
\ No newline at end of file
+            self.profiles.put(user_id, user_data)
+            session = MonitoringSession.from_profile(user_id, UserProfileCache.normalize(user_data))
+            logger.info(f"Инициализация данных для пользователя: user_id={user_id}, chat_id={session.chat_id}, мониторинг активен={session.is_monitoring_active}")
+
+            if not session.is_monitoring_active:
+                if user_id in states:
+                    self.stopped_sessions.add(user_id)
+                continue
+
+            if user_id in states:
+                session.restore_state(states[user_id])
+            self.sessions[user_id] = session
+
+            delay = session.next_run_delay(now) or random.uniform(0, session.check_interval)
+            delay += random.uniform(0, RESTART_JITTER)
+            try:
+                logger.info(f"Перезапуск мониторинга для пользователя: user_id={user_id}, chat_id={session.chat_id}, задержка={delay:.1f} сек")
+                self.launch_monitoring(session, initial_delay=delay)
+            except Exception as e:
+                logger.error(f"Ошибка при перезапуске мониторинга для пользователя {user_id}: {e}")
+
+    async def checkpoint_sessions(self):
+        """Сохраняет состояние активных сессий мониторинга в Redis и удаляет состояние остановленных."""
+        states = {user_id: session.to_state() for user_id, session in self.sessions.items() if session.is_monitoring_active}
+        removed, self.stopped_sessions = self.stopped_sessions, set()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.state_manager.save_states, states, removed)
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении состояния сессий мониторинга: {e}")
+            self.stopped_sessions |= removed - self.sessions.keys()
+
+    async def run_checkpoints(self):
+        """Периодически сохраняет состояние сессий мониторинга."""
+        while True:
+            await asyncio.sleep(SESSION_CHECKPOINT_INTERVAL)
+            await self.checkpoint_sessions()
+
+    def start_background_tasks(self):
+        """Запускает фоновую запись профилей и периодическое сохранение состояния сессий."""
+        self.profiles.start()
+        if SESSION_CHECKPOINT_INTERVAL > 0:
+            self.checkpoint_task = asyncio.create_task(self.run_checkpoints())
+
+    async def shutdown(self):
+        """Останавливает задачи мониторинга без изменения их статуса в Redis, сохраняет профили и состояние сессий."""
+        if self.checkpoint_task:
+            self.checkpoint_task.cancel()
+
+        for session in self.sessions.values():
+            if session.monitoring_task and not session.monitoring_task.done():
+                session.monitoring_task.cancel()
+
+        await self.profiles.stop()
+        await self.checkpoint_sessions()
+        logger.info("Состояние сессий мониторинга сохранено.")
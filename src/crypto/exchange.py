@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
 
+from src.crypto.ticker import Ticker
+
 
 class Exchange(ABC):
     """Абстрактный базовый класс для всех бирж."""
@@ -11,11 +13,15 @@ class Exchange(ABC):
         pass
 
     @abstractmethod
-    def filter_significant_changes(self, data: List[Dict], threshold: float) -> List[Dict]:
-        """Фильтрует монеты с изменениями цен, превышающими пороговое значение."""
+    def parse_tickers(self, data: List[Dict]) -> List[Ticker]:
+        """Разбирает ответ API биржи в нормализованные тикеры."""
         pass
 
+    def fetch_tickers(self) -> List[Ticker]:
+        """Получает данные с биржи и разбирает их в тикеры за один шаг."""
+        return self.parse_tickers(self.fetch_market_data())
+
     @abstractmethod
     def get_exchange_name(self) -> str:
         """Возвращает название биржи."""
-        pass
\ No newline at end of file
+        pass
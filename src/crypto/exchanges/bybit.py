@@ -1,7 +1,8 @@
 from pybit.unified_trading import HTTP
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from src.crypto.exchange import Exchange
+from src.crypto.ticker import Ticker
 
 from src.utils.logging_config import logger
 from src.config import BYBIT_API_KEY, BYBIT_API_SECRET
@@ -10,11 +11,14 @@ from src.config import BYBIT_API_KEY, BYBIT_API_SECRET
 class Bybit(Exchange):
     """Класс для работы с API Bybit."""
 
-    def __init__(self, api_key: str = BYBIT_API_KEY, secret_key: str = BYBIT_API_SECRET):
+    def __init__(self, api_key: str = BYBIT_API_KEY, secret_key: str = BYBIT_API_SECRET, endpoint: Optional[str] = None):
         self.api_key = api_key
         self.secret_key = secret_key
         self.session = HTTP(api_key=self.api_key, api_secret=self.secret_key)
 
+        if endpoint:
+            self.session.endpoint = endpoint.rstrip('/')
+
     def fetch_market_data(self) -> List[Dict]:
         """Извлекает данные о рынке с биржи Bybit."""
         try:
@@ -33,9 +37,9 @@ class Bybit(Exchange):
             logger.error(f"Ошибка при получении рыночных данных: {e}")
             return []
 
-    def filter_significant_changes(self, data: List[Dict], threshold: float) -> List[Dict]:
-        """Фильтрует монеты с изменениями цен, превышающими пороговое значение."""
-        significant_changes = []
+    def parse_tickers(self, data: List[Dict]) -> List[Ticker]:
+        """Разбирает тикеры Bybit в нормализованные тикеры."""
+        tickers = []
 
         for ticker in data:
             if not isinstance(ticker, dict):
@@ -46,26 +50,24 @@ class Bybit(Exchange):
                 symbol = ticker['symbol']
                 last_price = float(ticker['lastPrice'])
                 prev_price_24h = float(ticker['prevPrice24h'])
-                
+
                 if prev_price_24h == 0:
                     logger.warning(f"Пропущен тикер {symbol}, так как prev_price_24h равен 0.")
                     continue
 
-                price_change = ((last_price - prev_price_24h) / prev_price_24h) * 100
-
-                if abs(price_change) >= threshold:
-                    significant_changes.append({
-                        'symbol': symbol,
-                        'price_change': price_change,
-                        'last_price': last_price,
-                        'prev_price_24h': prev_price_24h
-                    })
-                    # logger.info(f"Монета {symbol} отфильтрована: изменение {price_change:.2f}%")
-                    
+                tickers.append(Ticker(
+                    symbol=symbol,
+                    last_price=last_price,
+                    price_change=((last_price - prev_price_24h) / prev_price_24h) * 100,
+                    prev_price_24h=prev_price_24h,
+                    volume=float(ticker.get('volume24h') or 0),
+                    turnover=float(ticker.get('turnover24h') or 0)
+                ))
+
             except (TypeError, ValueError, KeyError) as e:
                 logger.error(f"Ошибка при обработке данных для {ticker.get('symbol', 'неизвестный символ')}: {e}")
 
-        return significant_changes
+        return tickers
 
     def get_exchange_name(self) -> str:
         """Возвращает название биржи."""
@@ -0,0 +1,91 @@
+import asyncio
+
+from typing import Dict, Optional, Any
+
+from src.config import CRYPTO_CHECK_INTERVAL, PRICE_CHANGE_THRESHOLD
+
+
+class MonitoringSession:
+    """Состояние мониторинга одного пользователя: настройки, фаза расписания и кулдауны алертов."""
+
+    def __init__(self, user_id: int, chat_id: int, username: str, is_monitoring_active: bool = False):
+        """
+        Инициализация сессии мониторинга.
+
+        :param user_id: Идентификатор пользователя.
+        :param chat_id: Идентификатор чата для уведомлений.
+        :param username: Имя пользователя.
+        :param is_monitoring_active: Статус активности мониторинга.
+        """
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.username = username
+        self.is_monitoring_active = is_monitoring_active
+
+        self.check_interval = CRYPTO_CHECK_INTERVAL
+        self.price_change_threshold = PRICE_CHANGE_THRESHOLD
+        self.alert_rule = ""
+
+        self.monitoring_task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[float] = None
+        self.last_alerts: Dict[str, float] = {}
+
+    @classmethod
+    def from_profile(cls, user_id: int, profile: Dict[str, Any]) -> "MonitoringSession":
+        """Создаёт сессию по профилю пользователя из UserProfileCache."""
+        session = cls(user_id, profile["chat_id"], profile["username"], profile["is_monitoring_active"])
+        session.check_interval = profile["check_interval"]
+        session.price_change_threshold = profile["price_change_threshold"]
+        session.alert_rule = profile["alert_rule"]
+        return session
+
+    def to_profile(self) -> Dict[str, Any]:
+        """Возвращает настройки сессии в формате профиля пользователя."""
+        return {
+            "chat_id": self.chat_id,
+            "username": self.username,
+            "is_monitoring_active": self.is_monitoring_active,
+            "check_interval": self.check_interval,
+            "price_change_threshold": self.price_change_threshold,
+            "alert_rule": self.alert_rule,
+        }
+
+    def is_running(self) -> bool:
+        """Возвращает True, если задача мониторинга запущена и не завершена."""
+        return self.is_monitoring_active and self.monitoring_task is not None and not self.monitoring_task.done()
+
+    def next_run_delay(self, now: float) -> float:
+        """Возвращает задержку до следующей проверки с учётом фазы расписания до перезапуска."""
+        if self.last_run_at is None:
+            return 0.0
+        return max(0.0, self.last_run_at + self.check_interval - now)
+
+    def should_alert(self, key: str, now: float, cooldown: float) -> bool:
+        """
+        Проверяет кулдаун алерта и, если он истёк, отмечает алерт как отправленный.
+
+        :param key: Ключ алерта в формате '<биржа>:<символ>'.
+        :param now: Текущее время (unix timestamp).
+        :param cooldown: Минимальный интервал между повторными алертами в секундах.
+        """
+        last_alert_at = self.last_alerts.get(key)
+        if last_alert_at is not None and now - last_alert_at < cooldown:
+            return False
+        self.last_alerts[key] = now
+        return True
+
+    def prune_alerts(self, now: float, cooldown: float):
+        """Удаляет истёкшие кулдауны, чтобы состояние не росло неограниченно."""
+        self.last_alerts = {key: ts for key, ts in self.last_alerts.items() if now - ts < cooldown}
+
+    def to_state(self) -> Dict[str, Any]:
+        """Сериализует состояние сессии для сохранения в Redis (настройки хранятся в профиле пользователя)."""
+        return {
+            "last_run_at": self.last_run_at,
+            "last_alerts": self.last_alerts,
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Восстанавливает состояние сессии, сохранённое методом to_state."""
+        self.last_run_at = state.get("last_run_at")
+        self.last_alerts = dict(state.get("last_alerts") or {})
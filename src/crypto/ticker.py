@@ -0,0 +1,43 @@
+import math
+
+from typing import List
+
+
+class Ticker:
+    """Нормализованный тикер биржи. Создаётся один раз при получении данных и дальше передаётся без повторного разбора."""
+
+    __slots__ = ("symbol", "last_price", "prev_price_24h", "price_change", "volume", "turnover")
+
+    def __init__(self, symbol: str, last_price: float, price_change: float, prev_price_24h: float = math.nan,
+                 volume: float = 0.0, turnover: float = 0.0):
+        """
+        :param symbol: Символ торговой пары.
+        :param last_price: Цена последней сделки.
+        :param price_change: Изменение цены за 24 часа в процентах.
+        :param prev_price_24h: Цена 24 часа назад (NaN, если биржа её не сообщает).
+        :param volume: Объём торгов за 24 часа.
+        :param turnover: Оборот за 24 часа.
+        """
+        self.symbol = symbol
+        self.last_price = last_price
+        self.prev_price_24h = prev_price_24h
+        self.price_change = price_change
+        self.volume = volume
+        self.turnover = turnover
+
+    def to_list(self) -> list:
+        """Компактное представление для сериализации в JSON."""
+        return [self.symbol, self.last_price, self.price_change, self.prev_price_24h, self.volume, self.turnover]
+
+    def __repr__(self) -> str:
+        return f"Ticker({self.symbol!r}, last_price={self.last_price}, price_change={self.price_change:.2f}%)"
+
+
+def tickers_to_lists(tickers: List[Ticker]) -> List[list]:
+    """Сериализует список тикеров в список списков."""
+    return [ticker.to_list() for ticker in tickers]
+
+
+def tickers_from_lists(values: List[list]) -> List[Ticker]:
+    """Восстанавливает список тикеров из списка списков."""
+    return [Ticker(*item) for item in values]
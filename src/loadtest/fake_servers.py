@@ -0,0 +1,226 @@
+import asyncio
+import json
+import random
+import re
+import time
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+
+ALERT_PATTERN = re.compile(r"<b>(?P<exchange>.+?)</b> монета <b>(?P<symbol>.+?)</b>")
+# Уведомления мониторинга (алерты и сообщения об отсутствии изменений); всё остальное — ответы на команды.
+NOTIFICATION_PATTERN = re.compile(r"На бирже <b>.+?</b>")
+
+
+class FakeTelegramApi:
+    """Локальная замена Telegram Bot API: раздаёт обновления через getUpdates и принимает sendMessage."""
+
+    def __init__(self, market: "FakeMarket"):
+        self.market = market
+        self.pending_updates: Deque[Dict] = deque()
+        self.next_update_id = 1
+        self.sent_messages = 0
+        self.replies = 0
+        self.latencies: List[float] = []
+        self._seen_alerts = set()
+
+    def setup_routes(self, app: web.Application):
+        """Регистрирует маршруты Bot API в приложении aiohttp."""
+        app.router.add_post("/bot{token}/{method}", self.handle_method)
+        app.router.add_get("/bot{token}/{method}", self.handle_method)
+
+    def enqueue_message(self, user_id: int, text: str):
+        """Ставит в очередь входящее сообщение от пользователя."""
+        update_id = self.next_update_id
+        self.next_update_id += 1
+
+        message = {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"},
+            "text": text,
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+
+        self.pending_updates.append({"update_id": update_id, "message": message})
+
+    async def handle_method(self, request: web.Request) -> web.Response:
+        """Обрабатывает вызов метода Bot API."""
+        method = request.match_info["method"]
+        params = dict(request.query)
+        if request.method == "POST":
+            params.update(await request.post())
+
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "LoadTest", "username": "load_test_bot"}
+        elif method == "getUpdates":
+            result = await self.get_updates(params)
+        elif method == "sendMessage":
+            result = self.send_message(params)
+        else:
+            result = True
+
+        return web.json_response({"ok": True, "result": result})
+
+    async def get_updates(self, params: Dict) -> List[Dict]:
+        """Long polling: возвращает обновления начиная с offset или пустой список по таймауту."""
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        deadline = time.monotonic() + float(params.get("timeout") or 0)
+
+        while True:
+            while self.pending_updates and self.pending_updates[0]["update_id"] < offset:
+                self.pending_updates.popleft()
+
+            if self.pending_updates or time.monotonic() >= deadline:
+                return [self.pending_updates[i] for i in range(min(limit, len(self.pending_updates)))]
+
+            await asyncio.sleep(0.01)
+
+    def send_message(self, params: Dict) -> Dict:
+        """Принимает исходящее сообщение бота и учитывает задержку алерта относительно ценового шока."""
+        received_at = time.monotonic()
+        chat_id = int(params["chat_id"])
+        text = params.get("text", "")
+        self.sent_messages += 1
+        if not NOTIFICATION_PATTERN.search(text):
+            self.replies += 1
+
+        match = ALERT_PATTERN.search(text)
+        if match:
+            shock = self.market.active_shock(match.group("exchange"), match.group("symbol"))
+            if shock is not None:
+                shock_id, shocked_at = shock
+                if (chat_id, shock_id) not in self._seen_alerts:
+                    self._seen_alerts.add((chat_id, shock_id))
+                    self.latencies.append(received_at - shocked_at)
+
+        return {
+            "message_id": self.sent_messages,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text,
+        }
+
+
+class FakeMarket:
+    """Синтетический рынок с тикерами в форматах Bybit и KuCoin и поддержкой ценовых шоков."""
+
+    def __init__(self, symbols: int, seed: int = 0):
+        rng = random.Random(seed)
+        self.tickers: Dict[str, Dict[str, Tuple[float, float, float]]] = {"Bybit": {}, "KuCoin": {}}
+
+        for exchange_name, tickers in self.tickers.items():
+            for i in range(symbols):
+                prev_price = rng.uniform(0.01, 50000)
+                last_price = prev_price * (1 + rng.uniform(-0.01, 0.01))
+                tickers[f"COIN{i}USDT"] = (last_price, prev_price, rng.uniform(1e3, 1e7))
+
+        self.shock_id = 0
+        self.shocks: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._baseline: Dict[Tuple[str, str], Tuple[float, float, float]] = {}
+
+    def setup_routes(self, app: web.Application):
+        """Регистрирует маршруты тикеров Bybit и KuCoin в приложении aiohttp."""
+        app.router.add_get("/v5/market/tickers", self.handle_bybit)
+        app.router.add_get("/api/v1/market/allTickers", self.handle_kucoin)
+
+    def shock(self, exchange_name: str, symbol: str, change: float):
+        """Выставляет 24-часовое изменение цены монеты в change процентов; предыдущий шок снимается."""
+        for key, baseline in self._baseline.items():
+            self.tickers[key[0]][key[1]] = baseline
+        self._baseline.clear()
+        self.shocks.clear()
+
+        last_price, prev_price, volume = self.tickers[exchange_name][symbol]
+        self._baseline[(exchange_name, symbol)] = (last_price, prev_price, volume)
+        self.tickers[exchange_name][symbol] = (prev_price * (1 + change / 100), prev_price, volume)
+
+        self.shock_id += 1
+        self.shocks[(exchange_name, symbol)] = (self.shock_id, time.monotonic())
+
+    def active_shock(self, exchange_name: str, symbol: str) -> Optional[Tuple[int, float]]:
+        """Возвращает (id, момент) действующего шока для монеты или None."""
+        return self.shocks.get((exchange_name, symbol))
+
+    async def handle_bybit(self, request: web.Request) -> web.Response:
+        """Ответ в формате GET /v5/market/tickers?category=spot."""
+        tickers = [
+            {
+                "symbol": symbol,
+                "lastPrice": f"{last_price:.8f}",
+                "prevPrice24h": f"{prev_price:.8f}",
+                "price24hPcnt": f"{(last_price - prev_price) / prev_price:.6f}",
+                "highPrice24h": f"{max(last_price, prev_price):.8f}",
+                "lowPrice24h": f"{min(last_price, prev_price):.8f}",
+                "volume24h": f"{volume:.4f}",
+                "turnover24h": f"{volume * last_price:.4f}",
+            }
+            for symbol, (last_price, prev_price, volume) in self.tickers["Bybit"].items()
+        ]
+        body = {"retCode": 0, "retMsg": "OK", "result": {"category": "spot", "list": tickers}, "time": int(time.time() * 1000)}
+        return web.Response(text=json.dumps(body), content_type="application/json")
+
+    async def handle_kucoin(self, request: web.Request) -> web.Response:
+        """Ответ в формате GET /api/v1/market/allTickers."""
+        tickers = [
+            {
+                "symbol": symbol,
+                "symbolName": symbol,
+                "last": f"{last_price:.8f}",
+                "averagePrice": f"{prev_price:.8f}",
+                "changeRate": f"{(last_price - prev_price) / prev_price:.6f}",
+                "changePrice": f"{last_price - prev_price:.8f}",
+                "vol": f"{volume:.4f}",
+                "volValue": f"{volume * last_price:.4f}",
+            }
+            for symbol, (last_price, prev_price, volume) in self.tickers["KuCoin"].items()
+        ]
+        body = {"code": "200000", "data": {"time": int(time.time() * 1000), "ticker": tickers}}
+        return web.Response(text=json.dumps(body), content_type="application/json")
+
+
+class FakeServers:
+    """Приложение aiohttp, объединяющее фейковые Telegram Bot API, биржи и управляющие маршруты нагрузочного теста."""
+
+    def __init__(self, symbols: int):
+        self.market = FakeMarket(symbols)
+        self.telegram = FakeTelegramApi(self.market)
+
+        self.app = web.Application(client_max_size=256 * 1024 ** 2)
+        self.telegram.setup_routes(self.app)
+        self.market.setup_routes(self.app)
+        self.app.router.add_post("/_control/messages", self.handle_enqueue)
+        self.app.router.add_post("/_control/shock", self.handle_shock)
+        self.app.router.add_get("/_control/stats", self.handle_stats)
+
+    async def handle_enqueue(self, request: web.Request) -> web.Response:
+        """Принимает пачку входящих сообщений [[user_id, text], ...]."""
+        for user_id, text in await request.json():
+            self.telegram.enqueue_message(int(user_id), text)
+        return web.json_response({"ok": True})
+
+    async def handle_shock(self, request: web.Request) -> web.Response:
+        """Применяет ценовой шок {exchange, symbol, change}."""
+        payload = await request.json()
+        self.market.shock(payload["exchange"], payload["symbol"], float(payload["change"]))
+        return web.json_response({"ok": True, "shock_id": self.market.shock_id})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Возвращает счётчики отправленных сообщений и ответов на команды, накопленные задержки алертов."""
+        return web.json_response({
+            "sent_messages": self.telegram.sent_messages,
+            "replies": self.telegram.replies,
+            "pending_updates": len(self.telegram.pending_updates),
+            "latencies": self.telegram.latencies,
+        })
+
+
+def run_fake_servers(host: str, port: int, symbols: int):
+    """Точка входа отдельного процесса с фейковыми серверами."""
+    web.run_app(FakeServers(symbols).app, host=host, port=port, print=None, handle_signals=True)
@@ -0,0 +1,205 @@
+import asyncio
+import multiprocessing
+import random
+import resource
+import time
+
+from typing import Dict, List
+
+import aiohttp
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+
+from src.bot import handlers
+from src.bot.create_bot import start_bot
+from src.crypto.exchanges.bybit import Bybit
+from src.crypto.exchanges.kucoin import KuCoin
+from src.loadtest.fake_servers import run_fake_servers
+from src.utils.redis_manager import RedisCacheManager
+
+from src.config import TELEGRAM_BOT_TOKEN
+from src.utils.logging_config import logger
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0..100) по методу ближайшего ранга."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def current_rss_mb() -> float:
+    """Текущий резидентный объём памяти процесса в МБ (Linux)."""
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() / 1024 ** 2
+
+
+class EventLoopLagProbe:
+    """Фоновая задача, измеряющая запаздывание event loop относительно запланированного пробуждения."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    def reset(self):
+        self.samples = []
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+
+class LoadTestScenario:
+    """Прогон полного стека start_bot против фейковых серверов для заданного числа пользователей."""
+
+    def __init__(self, users: int, symbols: int = 500, interval: int = 1, threshold: float = 5,
+                 duration: float = 60, shock_every: float = 5, host: str = "127.0.0.1", port: int = 8089):
+        self.users = users
+        self.symbols = symbols
+        self.interval = interval
+        self.threshold = threshold
+        self.duration = duration
+        self.shock_every = shock_every
+        self.base_url = f"http://{host}:{port}"
+        self.host = host
+        self.port = port
+        self.bot_task = None
+
+    def check_bot(self):
+        """Прерывает прогон, если start_bot завершился (например, Redis недоступен или порт занят)."""
+        if self.bot_task is None or not self.bot_task.done():
+            return
+        error = None if self.bot_task.cancelled() else self.bot_task.exception()
+        raise RuntimeError(f"Бот остановился во время нагрузочного теста: {error!r}") from error
+
+    async def control(self, session: aiohttp.ClientSession, method: str, path: str, payload=None) -> Dict:
+        async with session.request(method, f"{self.base_url}/_control/{path}", json=payload) as response:
+            return await response.json()
+
+    async def wait_for_server(self, session: aiohttp.ClientSession, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return await self.control(session, "GET", "stats")
+            except aiohttp.ClientConnectionError:
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+    async def send_phase(self, session: aiohttp.ClientSession, text: str, timeout: float) -> float:
+        """
+        Отправляет одно сообщение от каждого пользователя и ждёт по ответу на каждое.
+
+        Учитываются только ответы на команды: уведомления мониторинга, которые начинают приходить
+        после /start_monitor, не должны завершать фазу раньше времени.
+        """
+        started = time.monotonic()
+        expected = (await self.control(session, "GET", "stats"))["replies"] + self.users
+
+        batch_size = 10000
+        for start in range(0, self.users, batch_size):
+            batch = [[1_000_000 + i, text] for i in range(start, min(start + batch_size, self.users))]
+            await self.control(session, "POST", "messages", batch)
+
+        while (await self.control(session, "GET", "stats"))["replies"] < expected:
+            self.check_bot()
+            if time.monotonic() - started > timeout:
+                logger.warning(f"Фаза '{text}' не завершилась за {timeout} сек")
+                break
+            await asyncio.sleep(0.2)
+
+        return time.monotonic() - started
+
+    async def run(self) -> Dict:
+        server = multiprocessing.get_context("spawn").Process(
+            target=run_fake_servers, args=(self.host, self.port, self.symbols), daemon=True
+        )
+        server.start()
+
+        cache_manager = RedisCacheManager()
+        cache_manager.client.flushdb()
+
+        bot = Bot(
+            token=TELEGRAM_BOT_TOKEN,
+            session=AiohttpSession(api=TelegramAPIServer.from_base(self.base_url)),
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+        exchanges = [Bybit(endpoint=self.base_url), KuCoin(endpoint=self.base_url)]
+        probe = EventLoopLagProbe()
+        rng = random.Random(1)
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                await self.wait_for_server(session)
+
+                self.bot_task = asyncio.create_task(start_bot(bot, exchanges))
+                probe.start()
+                rss_start = current_rss_mb()
+
+                phase_timeout = max(60.0, self.users / 100)
+                registration = {}
+                for text in ("/start", "/conf", f"{self.interval} {self.threshold}", "/start_monitor"):
+                    registration[text] = await self.send_phase(session, text, phase_timeout)
+
+                probe.reset()
+                stats_before = await self.control(session, "GET", "stats")
+                measure_started = time.monotonic()
+
+                while time.monotonic() - measure_started < self.duration:
+                    self.check_bot()
+                    exchange = rng.choice(exchanges)
+                    exchange_name = exchange.get_exchange_name()
+                    await self.control(session, "POST", "shock", {
+                        "exchange": exchange_name,
+                        "symbol": f"COIN{rng.randrange(self.symbols)}USDT",
+                        "change": rng.choice((-2, 2)) * self.threshold,
+                    })
+                    # Иначе задержка алерта определяется TTL кэша тикеров в Redis (300 сек)
+                    # и возрастом общего снимка в памяти (SNAPSHOT_MAX_AGE), а не работой стека.
+                    await asyncio.get_running_loop().run_in_executor(None, cache_manager.clear_cache, exchange_name)
+                    handlers.crypto_monitor.snapshots.pop(exchange_name, None)
+                    await asyncio.sleep(self.shock_every)
+
+                measured = time.monotonic() - measure_started
+                stats_after = await self.control(session, "GET", "stats")
+                rss_end = current_rss_mb()
+                lag = list(probe.samples)
+        finally:
+            probe.stop()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await bot.session.close()
+            server.terminate()
+            server.join()
+
+        latencies = stats_after["latencies"]
+        return {
+            "users": self.users,
+            "registration_sec": registration,
+            "alerts_measured": len(latencies),
+            "alert_latency_sec": {q: percentile(latencies, q) for q in (50, 90, 99)},
+            "messages_per_sec": (stats_after["sent_messages"] - stats_before["sent_messages"]) / measured,
+            "rss_mb": {"start": rss_start, "end": rss_end,
+                       "peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024},
+            "loop_lag_sec": {"p50": percentile(lag, 50), "p99": percentile(lag, 99), "max": max(lag, default=0.0)},
+        }
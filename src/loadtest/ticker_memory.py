@@ -0,0 +1,91 @@
+"""
+Сравнение памяти, занимаемой 10 000 тикеров в разных представлениях (tracemalloc).
+
+Запуск: python -m src.loadtest.ticker_memory [число тикеров]
+"""
+import random
+import sys
+import tracemalloc
+
+from typing import List, Tuple
+
+from src.crypto.ticker import Ticker
+
+
+def generate_inputs(count: int, seed: int = 0) -> List[Tuple[int, float, float, float, float, float]]:
+    """Заранее сгенерированные числовые параметры тикеров, общие для всех сравниваемых представлений."""
+    rng = random.Random(seed)
+    inputs = []
+    for index in range(count):
+        prev_price = rng.uniform(0.01, 50000)
+        last_price = prev_price * (1 + rng.uniform(-0.1, 0.1))
+        inputs.append((index, prev_price, last_price, rng.uniform(1e3, 1e7), rng.uniform(1, 100), rng.uniform(1, 100)))
+    return inputs
+
+
+def raw_bybit_ticker(index: int, prev_price: float, last_price: float, volume: float, bid_size: float,
+                     ask_size: float) -> dict:
+    """Словарь строк в формате ответа Bybit /v5/market/tickers."""
+    return {
+        "symbol": f"COIN{index}USDT",
+        "bid1Price": f"{last_price * 0.999:.8f}",
+        "bid1Size": f"{bid_size:.4f}",
+        "ask1Price": f"{last_price * 1.001:.8f}",
+        "ask1Size": f"{ask_size:.4f}",
+        "lastPrice": f"{last_price:.8f}",
+        "prevPrice24h": f"{prev_price:.8f}",
+        "price24hPcnt": f"{(last_price - prev_price) / prev_price:.4f}",
+        "highPrice24h": f"{max(last_price, prev_price):.8f}",
+        "lowPrice24h": f"{min(last_price, prev_price):.8f}",
+        "turnover24h": f"{volume * last_price:.4f}",
+        "volume24h": f"{volume:.4f}",
+    }
+
+
+def parse(raw: dict) -> Ticker:
+    last_price = float(raw["lastPrice"])
+    prev_price = float(raw["prevPrice24h"])
+    return Ticker(raw["symbol"], last_price, (last_price - prev_price) / prev_price * 100, prev_price,
+                  float(raw["volume24h"]), float(raw["turnover24h"]))
+
+
+def as_dict(ticker: Ticker) -> dict:
+    return {
+        "symbol": ticker.symbol,
+        "price_change": ticker.price_change,
+        "last_price": ticker.last_price,
+        "prev_price_24h": ticker.prev_price_24h,
+        "volume": ticker.volume,
+        "turnover": ticker.turnover,
+    }
+
+
+def measure(build) -> int:
+    """Возвращает объём памяти, удерживаемой результатом build(), в байтах."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    inputs = generate_inputs(count)
+
+    # Каждое представление строится из одних и тех же входных данных внутри измеряемого окна,
+    # поэтому строки символов и числа принадлежат измеряемому результату во всех трёх случаях.
+    results = {
+        "исходные словари строк API": measure(lambda: [raw_bybit_ticker(*item) for item in inputs]),
+        "словари нормализованных полей": measure(lambda: [as_dict(parse(raw_bybit_ticker(*item))) for item in inputs]),
+        "Ticker (__slots__)": measure(lambda: [parse(raw_bybit_ticker(*item)) for item in inputs]),
+    }
+
+    print(f"Память на {count} тикеров:")
+    for name, size in results.items():
+        print(f"  {name:<32} {size / 1024 ** 2:8.2f} МБ  ({size / count:6.0f} Б/тикер)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from src.utils.redis_manager import RedisChatManager
+
+from src.utils.logging_config import logger
+from src.config import CRYPTO_CHECK_INTERVAL, PRICE_CHANGE_THRESHOLD, USER_CACHE_SIZE, USER_CACHE_FLUSH_INTERVAL
+
+
+class UserProfileCache:
+    """
+    Ограниченный LRU-кэш профилей пользователей в памяти процесса.
+
+    Чтение обслуживается из памяти (промах загружает профиль из Redis один раз),
+    изменения применяются к кэшу сразу и пачками записываются в Redis фоновой задачей.
+    """
+
+    def __init__(self, chat_manager: RedisChatManager, max_size: int = USER_CACHE_SIZE,
+                 flush_interval: float = USER_CACHE_FLUSH_INTERVAL):
+        """
+        Инициализация кэша профилей.
+
+        :param chat_manager: Менеджер данных пользователей в Redis.
+        :param max_size: Максимальное число профилей в памяти.
+        :param flush_interval: Период записи накопленных изменений в Redis в секундах.
+        """
+        self.chat_manager = chat_manager
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.profiles: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.pending: Dict[int, Dict[str, Any]] = {}
+        self.flush_task = None
+
+    @staticmethod
+    def normalize(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Приводит поля профиля к рабочим типам и подставляет значения по умолчанию."""
+        return {
+            "chat_id": int(data["chat_id"]),
+            "username": data.get("username", "Unknown"),
+            "is_monitoring_active": bool(int(data.get("is_monitoring_active", 0))),
+            "check_interval": int(data.get("check_interval", CRYPTO_CHECK_INTERVAL)),
+            "price_change_threshold": float(data.get("price_change_threshold", PRICE_CHANGE_THRESHOLD)),
+            "alert_rule": data.get("alert_rule", ""),
+        }
+
+    def put(self, user_id: int, profile: Dict[str, Any]):
+        """Помещает полный профиль в кэш без записи в Redis (например, после массовой загрузки)."""
+        self.profiles[user_id] = self.normalize(profile)
+        self.profiles.move_to_end(user_id)
+        while len(self.profiles) > self.max_size:
+            self.profiles.popitem(last=False)
+
+    async def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает профиль пользователя.
+
+        :param user_id: Идентификатор пользователя.
+        :return: Профиль пользователя или None, если пользователь не найден.
+        """
+        profile = self.profiles.get(user_id)
+        if profile is not None:
+            self.profiles.move_to_end(user_id)
+            return profile
+
+        stored_data = await asyncio.get_running_loop().run_in_executor(None, self.chat_manager.get_user_data, user_id)
+        if user_id in self.profiles:
+            return self.profiles[user_id]
+
+        pending = self.pending.get(user_id)
+        if not stored_data and not pending:
+            return None
+
+        self.put(user_id, {**(stored_data or {}), **(pending or {})})
+        return self.profiles[user_id]
+
+    def update(self, user_id: int, fields: Dict[str, Any]):
+        """
+        Применяет изменения к профилю в кэше и ставит их в очередь на запись в Redis.
+
+        :param user_id: Идентификатор пользователя.
+        :param fields: Изменяемые поля профиля.
+        """
+        profile = self.profiles.get(user_id)
+        if profile is not None:
+            profile.update(fields)
+            self.profiles.move_to_end(user_id)
+        self.pending.setdefault(user_id, {}).update(fields)
+
+    async def flush(self):
+        """Записывает накопленные изменения в Redis одной пачкой."""
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, {}
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.chat_manager.update_users, batch)
+        except Exception as e:
+            logger.error(f"Ошибка при записи профилей пользователей в Redis: {e}")
+            for user_id, fields in batch.items():
+                self.pending[user_id] = {**fields, **self.pending.get(user_id, {})}
+
+    async def run(self):
+        """Периодически сбрасывает накопленные изменения в Redis."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        """Запускает фоновую запись изменений."""
+        self.flush_task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Останавливает фоновую запись и сбрасывает оставшиеся изменения."""
+        if self.flush_task:
+            self.flush_task.cancel()
+        await self.flush()
@@ -0,0 +1,167 @@
+import asyncio
+import linecache
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+from src.utils.logging_config import logger
+from src.config import PROFILE_OUTPUT_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_SLOW_CALLBACK, PROFILE_TRACEMALLOC_TOP
+
+# Аллокации самого профилирования: в режиме отладки asyncio сохраняет трассировку создания каждого колбэка.
+PROFILER_TRACE_FILTERS = [
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, traceback.__file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, os.path.join(os.path.dirname(asyncio.__file__), "*")),
+]
+
+
+class SlowCallbackHandler(logging.Handler):
+    """Собирает предупреждения asyncio о медленных колбэках ('Executing ... took ... seconds')."""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.records: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith("Executing"):
+            self.records.append(f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {message}")
+
+
+class StackSampler:
+    """Семплирующий профайлер: периодически снимает стеки всех потоков и агрегирует их в формате folded stacks."""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def run(self):
+        own_ident = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(thread_names.get(ident, str(ident)))
+
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write(self, path: str):
+        """Сохраняет стеки в формате folded stacks (flamegraph.pl, speedscope)."""
+        with open(path, "w") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Профилирование работающего бота по запросу на фиксированное окно времени.
+
+    В выключенном состоянии ничего не устанавливает и не влияет на производительность.
+    """
+
+    def __init__(self, output_dir: str = PROFILE_OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.is_running = False
+
+    async def run(self, duration: float) -> Dict[str, str]:
+        """
+        Включает семплирующий профайлер, детектор медленных колбэков asyncio и tracemalloc на duration секунд.
+
+        :param duration: Длительность окна профилирования в секундах.
+        :return: Словарь {вид отчёта: путь к файлу}.
+        """
+        if self.is_running:
+            raise RuntimeError("Профилирование уже выполняется")
+        self.is_running = True
+
+        loop = asyncio.get_running_loop()
+        previous_debug = loop.get_debug()
+        previous_slow_callback = loop.slow_callback_duration
+        asyncio_logger = logging.getLogger("asyncio")
+        slow_callbacks = SlowCallbackHandler()
+        sampler = StackSampler()
+        started_tracemalloc = not tracemalloc.is_tracing()
+
+        logger.info(f"Профилирование запущено на {duration} сек")
+        try:
+            asyncio_logger.addHandler(slow_callbacks)
+            loop.slow_callback_duration = PROFILE_SLOW_CALLBACK
+            loop.set_debug(True)
+            if started_tracemalloc:
+                tracemalloc.start(25)
+            sampler.start()
+
+            await asyncio.sleep(duration)
+
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            sampler.stop()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            loop.set_debug(previous_debug)
+            loop.slow_callback_duration = previous_slow_callback
+            asyncio_logger.removeHandler(slow_callbacks)
+            self.is_running = False
+
+        report_dir = os.path.join(self.output_dir, time.strftime("%Y%m%d-%H%M%S"))
+        reports = await loop.run_in_executor(None, self.write_reports, report_dir, sampler, slow_callbacks, snapshot)
+
+        logger.info(f"Профилирование завершено: {sampler.samples} выборок, отчёты в {report_dir}")
+        return reports
+
+    @staticmethod
+    def write_reports(report_dir: str, sampler: StackSampler, slow_callbacks: SlowCallbackHandler,
+                      snapshot: tracemalloc.Snapshot) -> Dict[str, str]:
+        """
+        Сохраняет отчёты профилирования (выполняется в пуле потоков).
+
+        :return: Словарь {вид отчёта: путь к файлу}.
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        reports = {
+            "stacks": os.path.join(report_dir, "stacks.folded"),
+            "slow_callbacks": os.path.join(report_dir, "slow_callbacks.txt"),
+            "tracemalloc": os.path.join(report_dir, "tracemalloc_top.txt"),
+        }
+
+        sampler.write(reports["stacks"])
+
+        with open(reports["slow_callbacks"], "w") as output:
+            output.write(f"Порог: {PROFILE_SLOW_CALLBACK} сек, найдено: {len(slow_callbacks.records)}\n")
+            output.write("\n".join(slow_callbacks.records))
+
+        statistics = snapshot.filter_traces(PROFILER_TRACE_FILTERS).statistics("lineno")
+        with open(reports["tracemalloc"], "w") as output:
+            for statistic in statistics[:PROFILE_TRACEMALLOC_TOP]:
+                output.write(f"{statistic}\n")
+
+        return reports
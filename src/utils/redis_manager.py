@@ -1,9 +1,11 @@
 import redis
 import json
+import time
 
 from decouple import config
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
+from src.crypto.ticker import Ticker, tickers_to_lists, tickers_from_lists
 from src.utils.logging_config import logger
 
 
@@ -78,6 +80,20 @@ class RedisChatManager(RedisConfig):
         self.client.hset(key, mapping=updates)
         logger.info(f"Обновлены данные пользователя user_id='{user_id}': {updates}")
     
+    def update_users(self, updates: Dict[int, Dict[str, Any]]):
+        """
+        Обновляет данные нескольких пользователей одной командой (pipeline).
+
+        :param updates: Словарь формата {user_id: обновляемые данные}.
+        """
+        self.reconnect_if_needed()
+        pipeline = self.client.pipeline(transaction=False)
+        for user_id, fields in updates.items():
+            mapping = {key: int(value) if isinstance(value, bool) else value for key, value in fields.items()}
+            pipeline.hset(f"{self.hash_name}:{user_id}", mapping=mapping)
+        pipeline.execute()
+        logger.info(f"Обновлены данные {len(updates)} пользователей")
+
     def get_user_data(self, user_id: int) -> Optional[Dict[str, str]]:
         """
         Получает данные пользователя по user_id.
@@ -204,6 +220,37 @@ class RedisCacheManager(RedisConfig):
         logger.info(f"Получены данные для '{exchange_name}': {data}")
         return json.loads(data) if data else None
 
+    def save_tickers(self, exchange_name: str, tickers: List[Ticker], ttl: Optional[int] = None) -> float:
+        """
+        Сохраняет нормализованные тикеры биржи в кэше в компактном виде.
+
+        :param exchange_name: Название биржи для формирования ключа.
+        :param tickers: Тикеры биржи.
+        :param ttl: Время жизни данных в секундах (если указано).
+        :return: Метка времени снимка, по которой читатели отличают новые данные от прежних.
+        """
+        fetched_at = time.time()
+        self.save_data(exchange_name, {"fetched_at": fetched_at, "tickers": tickers_to_lists(tickers)}, ttl=ttl)
+        return fetched_at
+
+    def get_tickers(self, exchange_name: str) -> Optional[Tuple[float, List[Ticker]]]:
+        """
+        Получает нормализованные тикеры биржи из кэша.
+
+        :param exchange_name: Название биржи для формирования ключа.
+        :return: Пара (метка времени снимка, тикеры) или None, если данных нет.
+        """
+        self.reconnect_if_needed()
+        data = self.client.get(f"{self.cache_prefix}{exchange_name}")
+        payload = json.loads(data) if data else None
+
+        if not isinstance(payload, dict) or "tickers" not in payload:
+            logger.info(f"Тикеры для '{exchange_name}' в кэше не найдены")
+            return None
+
+        logger.info(f"Получено {len(payload['tickers'])} тикеров для '{exchange_name}' из кэша")
+        return payload["fetched_at"], tickers_from_lists(payload["tickers"])
+
     def clear_cache(self, exchange_name: str):
         """
         Очищает кэшированные данные по имени биржи.
@@ -213,4 +260,42 @@ class RedisCacheManager(RedisConfig):
         self.reconnect_if_needed()
         key = f"{self.cache_prefix}{exchange_name}"
         self.client.delete(key)
-        logger.info(f"Кэш очищен для '{exchange_name}'")
\ No newline at end of file
+        logger.info(f"Кэш очищен для '{exchange_name}'")
+
+
+class RedisSessionStateManager(RedisConfig):
+    """Класс для сохранения состояния сессий мониторинга (фаза расписания, кулдауны) между перезапусками."""
+
+    def __init__(self):
+        super().__init__()
+        self.hash_name = "monitor_state"
+
+    def save_states(self, states: Dict[int, Dict[str, Any]], removed: Iterable[int] = ()):
+        """
+        Сохраняет состояния нескольких сессий и удаляет состояния остановленных одной пачкой (pipeline).
+
+        :param states: Словарь формата {user_id: состояние сессии}.
+        :param removed: Идентификаторы пользователей, чьё состояние нужно удалить.
+        """
+        removed = list(removed)
+        if not states and not removed:
+            return
+        self.reconnect_if_needed()
+        pipeline = self.client.pipeline(transaction=False)
+        if states:
+            pipeline.hset(self.hash_name, mapping={user_id: json.dumps(state) for user_id, state in states.items()})
+        if removed:
+            pipeline.hdel(self.hash_name, *removed)
+        pipeline.execute()
+        logger.info(f"Сохранено состояние {len(states)} сессий мониторинга, удалено {len(removed)}")
+
+    def get_all_states(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Возвращает сохранённые состояния всех сессий.
+
+        :return: Словарь формата {user_id: состояние сессии}.
+        """
+        self.reconnect_if_needed()
+        states = {int(user_id): json.loads(state) for user_id, state in self.client.hgetall(self.hash_name).items()}
+        logger.info(f"Загружено состояние {len(states)} сессий мониторинга")
+        return states